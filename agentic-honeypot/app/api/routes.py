@@ -1,6 +1,11 @@
+import hmac
+import time
+
+import orjson
 from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from typing import Optional, List, Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
 
 from app.models.schemas import (
@@ -9,21 +14,37 @@ from app.models.schemas import (
     ErrorResponseModel,
     ExtractedIntelligenceModel
 )
-from app.core.scam_detector import detect_scam, get_scam_details
+from app.core.scam_detector import detect_scam, quick_scam_prefilter, user_hesitation
 from app.core.agent import generate_agent_reply, should_continue_engagement, generate_agent_notes
 from app.core.extractor import extract_intelligence, enrich_intelligence
-from app.services.guvi_callback import send_final_result
+from app.services.guvi_callback import enqueue_final_result
+from app.services.session_store import create_session_store, make_message, message_key
 from app.utils.config import settings
 from app.utils.logger import get_logger
-from app.core.exceptions import AuthenticationException, CallbackException
+from app.core.exceptions import AuthenticationException
 
 logger = get_logger(__name__)
 
-router = APIRouter(prefix="/api", tags=["analysis"])
+class SetSafeORJSONResponse(ORJSONResponse):
+    """orjson response that serializes intelligence sets directly as lists."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=list)
+
+
+# orjson encodes responses several times faster than stdlib json
+router = APIRouter(
+    prefix="/api",
+    tags=["analysis"],
+    default_response_class=SetSafeORJSONResponse
+)
+
+# Session storage backend: in-process by default, Redis when REDIS_URL is
+# set (multi-worker deployments with native TTL expiry)
+session_store = create_session_store()
 
-# In-memory session storage (appropriate for hackathon)
-# Format: {session_id: {"messages": [...], "intelligence": {...}, "created_at": datetime, "last_activity": datetime, "engagement_concluded": bool}}
-SESSION_STORE: Dict[str, Dict[str, Any]] = {}
+# Encoded once at import so every request doesn't re-encode the configured key
+_EXPECTED_KEY = settings.API_KEY.encode()
 
 
 def authenticate_request(x_api_key: Optional[str] = Header(None)) -> bool:
@@ -42,7 +63,8 @@ def authenticate_request(x_api_key: Optional[str] = Header(None)) -> bool:
             detail="Missing x-api-key header"
         )
     
-    if x_api_key != settings.API_KEY:
+    # Constant-time comparison: doesn't leak how much of the key matched
+    if not hmac.compare_digest(x_api_key.encode(), _EXPECTED_KEY):
         logger.warning(f"Invalid API key attempt: {x_api_key[:10]}...")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -52,58 +74,28 @@ def authenticate_request(x_api_key: Optional[str] = Header(None)) -> bool:
     return True
 
 
-def initialize_session(session_id: str) -> None:
-    """Initialize a new session."""
-    SESSION_STORE[session_id] = {
-        "messages": [],
-        "intelligence": {
-            "bankAccounts": [],
-            "upiIds": [],
-            "phishingLinks": [],
-            "phoneNumbers": [],
-            "suspiciousKeywords": [],
-            "emailAddresses": [],
-            "bitcoinAddresses": [],
-            "ipAddresses": []
-        },
-        "agent_replies": [],
-        "scam_detected": False,
-        "detection_details": {},
-        "created_at": datetime.now(),
-        "last_activity": datetime.now(),
-        "engagement_concluded": False,
-        "scam_score": 0
-    }
-    logger.info(f"Initialized new session: {session_id}")
+def _merge_intelligence(session: Dict[str, Any], new_intelligence: Dict[str, set]) -> None:
+    """Merge extracted intelligence into the session buckets (sets, O(1) dedup)."""
+    intelligence = session["intelligence"]
+    for key, values in new_intelligence.items():
+        if key in intelligence:
+            intelligence[key].update(values)
 
 
-def get_or_create_session(session_id: str) -> Dict[str, Any]:
-    """Get existing session or create new one."""
-    if session_id not in SESSION_STORE:
-        initialize_session(session_id)
-    else:
-        SESSION_STORE[session_id]["last_activity"] = datetime.now()
-    
-    return SESSION_STORE[session_id]
+def _last_activity_iso(session: Dict[str, Any]) -> str:
+    """Human-readable last-activity time for the session-info endpoint.
 
-
-def cleanup_old_sessions() -> None:
-    """Remove sessions that have timed out."""
-    timeout = timedelta(minutes=settings.SESSION_TIMEOUT_MINUTES)
-    current_time = datetime.now()
-    
-    expired_sessions = [
-        sid for sid, data in SESSION_STORE.items()
-        if current_time - data["last_activity"] > timeout
-    ]
-    
-    for session_id in expired_sessions:
-        logger.info(f"Cleaning up expired session: {session_id}")
-        del SESSION_STORE[session_id]
+    The in-memory store tracks activity as a monotonic float; convert back
+    to wall-clock time only here, off the hot path.
+    """
+    if session.get("last_activity"):
+        return session["last_activity"]
+    age_seconds = time.monotonic() - session["last_activity_mono"]
+    return datetime.fromtimestamp(datetime.now().timestamp() - age_seconds).isoformat()
 
 
 @router.post("/analyze-message", response_model=AgentReplyModel)
-def analyze_message(
+async def analyze_message(
     payload: AnalyzeMessageRequestModel,
     x_api_key: Optional[str] = Header(None)
 ) -> AgentReplyModel:
@@ -129,37 +121,72 @@ def analyze_message(
         # Authenticate
         authenticate_request(x_api_key)
         
-        # Cleanup old sessions
-        cleanup_old_sessions()
+        # Cleanup old sessions (no-op on backends with native expiry)
+        await session_store.cleanup()
         
         session_id = payload.sessionId
         message_text = payload.message.text
         sender = payload.message.sender
-        conversation_history = payload.conversationHistory or []
+        # Normalize validated history models into Message namedtuples once,
+        # so downstream code works on lightweight tuples with cached
+        # lowercase text
+        conversation_history = [
+            make_message(m.sender, m.text, m.timestamp)
+            for m in payload.conversationHistory
+        ]
         
         logger.info(f"Processing message for session {session_id}, sender: {sender}")
+
+        # Cheap pre-filter: if this would be a brand-new session and the
+        # message carries no scam signal at all, ignore it without paying
+        # any session-state costs (most benign probes end here). The
+        # fetched session is passed back to get_or_create so the backend
+        # isn't hit twice per request.
+        session = await session_store.get(session_id)
+        if session is None and not quick_scam_prefilter(message_text):
+            logger.info(f"Non-scam message in session {session_id}, ignoring")
+            return AgentReplyModel(status="ignored", reply=None)
+
+        # Create the session if new, refresh activity if existing
+        session = await session_store.get_or_create(session_id, session)
         
-        # Get or create session
-        session = get_or_create_session(session_id)
-        
-        # Add message to session history
-        session["messages"].append({
-            "sender": sender,
-            "text": message_text,
-            "timestamp": payload.message.timestamp
-        })
+        # Add message to session history, caching the lowercase form once
+        # so downstream keyword scans don't re-fold the same text
+        current_message = make_message(sender, message_text, payload.message.timestamp)
+        session["messages"].append(current_message)
+        if sender == "scammer":
+            session["scammer_texts"].append(current_message.text_lower)
+        elif sender == "user" and not session["user_hesitated"]:
+            session["user_hesitated"] = user_hesitation(current_message.text_lower)
         
         total_messages = len(session["messages"])
-        
-        # Detect scam intent
-        is_scam, reasons, score = detect_scam(message_text, conversation_history)
+
+        # Fold hesitation in from history before detection, so a first
+        # request that carries prior user pushback still earns the
+        # escalation bonus on this call. The monotone flag short-circuits
+        # the scan for the rest of the session once set.
+        if not session["user_hesitated"]:
+            for msg in conversation_history:
+                if msg.sender == "user" and user_hesitation(msg.text_lower):
+                    session["user_hesitated"] = True
+                    break
+
+        # Detect scam intent and classification in a single pass
+        is_scam, reasons, score, scam_types = detect_scam(
+            message_text,
+            conversation_history,
+            return_details=True,
+            msg_lower=current_message.text_lower,
+            user_hesitated=session["user_hesitated"]
+        )
         session["scam_score"] = max(session["scam_score"], score)
         
-        logger.debug(f"Scam detection - Score: {score}, Scam: {is_scam}, Reasons: {reasons}")
+        logger.debug("Scam detection - Score: %s, Scam: %s, Reasons: %s", score, is_scam, reasons)
         
         # If scam not detected on first message, ignore
         if not is_scam:
             logger.info(f"Non-scam message in session {session_id}, ignoring")
+            await session_store.save(session_id, session)
             return AgentReplyModel(status="ignored", reply=None)
         
         # Mark scam as detected
@@ -169,31 +196,35 @@ def analyze_message(
                 "score": score,
                 "reasons": reasons,
                 "message_index": total_messages,
-                "scam_types": get_scam_details(message_text)
+                "scam_types": scam_types
             }
             logger.warning(f"🚨 SCAM DETECTED in session {session_id}: {reasons}")
         
-        # Extract intelligence from current message and full conversation
-        full_conversation = conversation_history + [
-            {
-                "sender": sender,
-                "text": message_text,
-                "timestamp": payload.message.timestamp
-            }
-        ]
-        
-        new_intelligence = extract_intelligence(message_text, full_conversation)
-        
-        # Merge intelligence
-        for key in new_intelligence:
-            if key in session["intelligence"]:
-                session["intelligence"][key].extend(new_intelligence[key])
-                session["intelligence"][key] = list(set(session["intelligence"][key]))  # Deduplicate
+        full_conversation = conversation_history + [current_message]
+
+        # Extract intelligence incrementally: each message is scanned once
+        # per session, tracked by key, instead of re-extracting the whole
+        # conversation on every turn
+        _merge_intelligence(session, extract_intelligence(message_text))
+        session["processed_ids"].add(message_key(current_message))
+
+        for msg in conversation_history:
+            key = message_key(msg)
+            if key not in session["processed_ids"]:
+                session["processed_ids"].add(key)
+                _merge_intelligence(session, extract_intelligence(msg.text))
+                if msg.sender == "scammer":
+                    # Keep the cached scammer-text concatenation complete
+                    # for messages that only ever arrived via history
+                    session["scammer_texts"].append(msg.text_lower)
         
-        logger.debug(f"Accumulated intelligence: {session['intelligence']}")
+        logger.debug("Accumulated intelligence: %s", session["intelligence"])
         
         # Generate agent reply
-        agent_reply = generate_agent_reply(conversation_history)
+        agent_reply = generate_agent_reply(
+            conversation_history,
+            recent_reply_ids=session["recent_reply_ids"]
+        )
         session["agent_replies"].append(agent_reply)
         
         logger.info(f"Agent reply for session {session_id}: {agent_reply}")
@@ -205,45 +236,43 @@ def analyze_message(
             settings.MAX_MESSAGES_PER_SESSION
         )
         
-        # Send final callback if engagement is complete
+        # Send final callback if engagement is complete. The POST runs as a
+        # background task so the response isn't held up by the GUVI round-trip.
         if not should_continue and not session["engagement_concluded"]:
-            try:
-                # Generate notes about scammer behavior
-                agent_notes = generate_agent_notes(full_conversation, session["intelligence"])
-                
-                logger.info(f"Concluding engagement for session {session_id}")
-                logger.debug(f"Agent notes: {agent_notes}")
-                
-                # Send to GUVI evaluation endpoint
-                success = send_final_result(
-                    session_id=session_id,
-                    intelligence=session["intelligence"],
-                    total_messages=total_messages,
-                    agent_notes=agent_notes,
-                    scam_detected=True
-                )
-                
-                if success:
-                    session["engagement_concluded"] = True
-                    logger.info(f"✓ Final result sent for session {session_id}")
-                else:
-                    logger.warning(f"⚠ Final result callback may have failed for {session_id}")
-                    
-            except CallbackException as e:
-                logger.error(f"Callback error for session {session_id}: {e}")
-                # Don't fail the response, but log the error
-        
+            # Generate notes about scammer behavior
+            agent_notes = generate_agent_notes(
+                full_conversation,
+                session["intelligence"],
+                scammer_text_lower=" ".join(session["scammer_texts"])
+            )
+
+            logger.info(f"Concluding engagement for session {session_id}")
+            logger.debug("Agent notes: %s", agent_notes)
+
+            # Send to GUVI evaluation endpoint (materialize sets as lists);
+            # delivery and retries happen on the background worker
+            enqueue_final_result(
+                session_id=session_id,
+                intelligence={k: list(v) for k, v in session["intelligence"].items()},
+                total_messages=total_messages,
+                agent_notes=agent_notes,
+                scam_detected=True
+            )
+
+            session["engagement_concluded"] = True
+
         # Check if we should conclude without explicit max messages
         elif total_messages >= settings.MIN_MESSAGES_BEFORE_CALLBACK and not session["engagement_concluded"]:
             # Optional: implement smarter logic to decide when to conclude
             pass
-        
+
+        await session_store.save(session_id, session)
         return AgentReplyModel(status="success", reply=agent_reply)
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error processing message: {e}", exc_info=True)
+        logger.error("Error processing message: %s", e, exc_info=settings.LOG_TRACEBACKS)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -251,7 +280,7 @@ def analyze_message(
 
 
 @router.get("/session/{session_id}")
-def get_session_info(
+async def get_session_info(
     session_id: str,
     x_api_key: Optional[str] = Header(None)
 ) -> Dict[str, Any]:
@@ -260,32 +289,32 @@ def get_session_info(
     Requires authentication.
     """
     authenticate_request(x_api_key)
-    
-    if session_id not in SESSION_STORE:
+
+    session = await session_store.get(session_id)
+    if session is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Session {session_id} not found"
         )
-    
-    session = SESSION_STORE[session_id]
+
     return {
         "sessionId": session_id,
         "messageCount": len(session["messages"]),
         "scamDetected": session["scam_detected"],
         "detectionDetails": session["detection_details"],
-        "extractedIntelligence": session["intelligence"],
+        "extractedIntelligence": {k: list(v) for k, v in session["intelligence"].items()},
         "engagementConcluded": session["engagement_concluded"],
-        "createdAt": session["created_at"].isoformat(),
-        "lastActivity": session["last_activity"].isoformat()
+        "createdAt": session["created_at"],
+        "lastActivity": _last_activity_iso(session)
     }
 
 
 @router.get("/health")
-def health_check() -> Dict[str, Any]:
+async def health_check() -> Dict[str, Any]:
     """Health check endpoint (no authentication required)."""
     return {
         "status": "running",
         "service": settings.API_TITLE,
         "version": settings.API_VERSION,
-        "sessions": len(SESSION_STORE)
+        "sessions": await session_store.count()
     }
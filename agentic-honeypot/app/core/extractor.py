@@ -1,6 +1,7 @@
 import re
 import os
 import sys
+from functools import lru_cache
 from typing import Dict, List
 
 # Ensure project root is on sys.path so `from app...` imports work
@@ -8,6 +9,8 @@ ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
+from app.core.keyword_matcher import KeywordMatcher
+
 try:
     from app.utils.logger import get_logger
 except Exception:
@@ -25,40 +28,108 @@ logger = get_logger(__name__)
 # Regex patterns for intelligence extraction
 UPI_REGEX = r"\b[\w.\-]{2,}@[a-zA-Z]{2,}\b"  # UPI IDs like name@upi, user@ybl, etc.
 URL_REGEX = r"https?://[^\s]+"  # HTTP/HTTPS links
-PHONE_REGEX = r"(?:\+91|91|0)?\s*[6-9]\d{9}"  # Indian phone numbers
+# Indian phone numbers. Digit-boundary lookarounds anchor the match so the
+# engine can't backtrack through other digit runs. The separator lives
+# inside the optional prefix group: a bare number must start on its first
+# digit, so it can't grab the preceding whitespace and preempt the UPI and
+# email alternatives in COMBINED_RE for shapes like "9876543210@ybl".
+PHONE_REGEX = r"(?<!\d)(?:(?:\+91|91|0)[\s-]?)?[6-9]\d{9}(?!\d)"
 BANK_ACCOUNT_REGEX = r"\b\d{9,18}\b"  # Bank account numbers (9-18 digits)
 EMAIL_REGEX = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"  # Email addresses
 BITCOIN_REGEX = r"\b[13][a-km-zA-HJ-NP-Z1-9]{25,34}\b"  # Bitcoin addresses
 IP_ADDRESS_REGEX = r"\b(?:\d{1,3}\.){3}\d{1,3}\b"  # IP addresses
 
+# Precompiled patterns - compiled once at import instead of on every findall call.
+# All patterns are fused into a single alternation with named groups so each
+# message is scanned exactly once. Ordering matters (first alternative wins):
+# email before UPI since both match "user@domain" shapes, and phone before
+# bank so a digit run that is a phone number isn't double-reported as an
+# account. Timestamp-shaped bank matches are filtered at dispatch.
+COMBINED_RE = re.compile(
+    f"(?P<email>{EMAIL_REGEX})"
+    f"|(?P<upi>(?i:{UPI_REGEX}))"
+    f"|(?P<url>{URL_REGEX})"
+    f"|(?P<phone>{PHONE_REGEX})"
+    f"|(?P<bank>{BANK_ACCOUNT_REGEX})"
+    f"|(?P<btc>{BITCOIN_REGEX})"
+    f"|(?P<ip>{IP_ADDRESS_REGEX})"
+)
+_NON_DIGIT_RE = re.compile(r"\D")
+
+
+def _normalize_phone(raw: str) -> str:
+    """Strip the +91/91/0 prefix and separators down to the 10-digit number."""
+    return _NON_DIGIT_RE.sub("", raw)[-10:]
+
+# Maps COMBINED_RE group names to intelligence bucket keys
+GROUP_TO_BUCKET = {
+    "email": "emailAddresses",
+    "upi": "upiIds",
+    "url": "phishingLinks",
+    "phone": "phoneNumbers",
+    "bank": "bankAccounts",
+    "btc": "bitcoinAddresses",
+    "ip": "ipAddresses",
+}
+
 # Suspicious keywords that indicate scam tactics
 SUSPICIOUS_KEYWORDS = [
-    "urgent", "verify", "blocked", "suspended", "freeze", "confirm", 
+    "urgent", "verify", "blocked", "suspended", "freeze", "confirm",
     "immediate", "claim", "update", "click", "download", "authenticate",
     "password", "otp", "pin", "cvv", "secret", "validate", "activate",
     "renew", "expire", "unauthorized", "secure", "protect", "danger",
     "limited", "today", "now", "asap", "hurry", "quickly", "immediately"
 ]
 
+# Built once at import - finds all keyword hits in a single pass over the text
+SUSPICIOUS_KEYWORD_MATCHER = KeywordMatcher(SUSPICIOUS_KEYWORDS)
 
-def clean_intelligence(intel_dict: Dict[str, List[str]]) -> Dict[str, List[str]]:
-    """Remove duplicates and invalid entries."""
-    cleaned = {}
-    for key, values in intel_dict.items():
-        # Remove duplicates and convert to lowercase for consistency
-        unique_values = list(set(str(v).lower().strip() for v in values if v))
-        cleaned[key] = [v for v in unique_values if v]  # Remove empty strings
-    return cleaned
 
+def clean_intelligence(intel_dict: Dict[str, List[str]]) -> Dict[str, set]:
+    """Remove duplicates and invalid entries.
 
-def extract_intelligence(text: str, full_conversation: list = None) -> Dict[str, List[str]]:
+    Returns sets so callers can merge into accumulated session state with
+    O(1) membership checks instead of rebuilding lists.
     """
-    Extract intelligence from scam message.
-    
+    # Single pass per bucket: values come straight from the regex pipeline,
+    # so they are already strings - normalize, drop empties, dedup at once
+    return {
+        key: {s for s in (v.lower().strip() for v in values if v) if s}
+        for key, values in intel_dict.items()
+    }
+
+
+# Bucket order for the cached extraction tuple
+_BUCKETS = (
+    "bankAccounts", "upiIds", "phishingLinks", "phoneNumbers",
+    "suspiciousKeywords", "emailAddresses", "bitcoinAddresses", "ipAddresses"
+)
+
+
+def extract_intelligence(text: str) -> Dict[str, set]:
+    """
+    Extract intelligence from a single scam message.
+
+    Callers are expected to run this once per message and accumulate the
+    results on the session, rather than re-extracting the whole
+    conversation on every turn. Results are memoized per message text:
+    scam campaigns repeat the same boilerplate across many sessions, so
+    duplicate messages skip the regex pipeline entirely.
+
     Returns:
-        Dictionary with extracted: bankAccounts, upiIds, phishingLinks, 
+        Dictionary of deduplicated sets: bankAccounts, upiIds, phishingLinks,
         phoneNumbers, suspiciousKeywords
     """
+    # Copy out of the cache so callers can mutate/merge freely
+    return {
+        bucket: set(values)
+        for bucket, values in zip(_BUCKETS, _extract_cached(text))
+    }
+
+
+@lru_cache(maxsize=4096)
+def _extract_cached(text: str) -> tuple:
+    """Run the extraction pipeline, returning a tuple of frozensets."""
     intelligence = {
         "bankAccounts": [],
         "upiIds": [],
@@ -71,87 +142,53 @@ def extract_intelligence(text: str, full_conversation: list = None) -> Dict[str,
     }
     
     try:
-        # Extract UPI IDs
-        upi_matches = re.findall(UPI_REGEX, text, re.IGNORECASE)
-        intelligence["upiIds"].extend(upi_matches)
-        
-        # Extract phishing links
-        link_matches = re.findall(URL_REGEX, text)
-        intelligence["phishingLinks"].extend(link_matches)
-        
-        # Extract phone numbers (Indian format)
-        phone_matches = re.findall(PHONE_REGEX, text)
-        intelligence["phoneNumbers"].extend(phone_matches)
-        
-        # Extract bank accounts (consecutive digits, typically 9-18)
-        account_matches = re.findall(BANK_ACCOUNT_REGEX, text)
-        # Filter: remove very short numbers and timestamps
-        valid_accounts = [
-            acc for acc in account_matches 
-            if 9 <= len(acc) <= 18 and not is_likely_timestamp(acc)
-        ]
-        intelligence["bankAccounts"].extend(valid_accounts)
-        
-        # Extract email addresses
-        email_matches = re.findall(EMAIL_REGEX, text)
-        # Filter out common non-suspicious emails
-        suspicious_emails = [
-            e for e in email_matches 
-            if not any(domain in e.lower() for domain in ["@gmail.com", "@yahoo.com", "@outlook.com"])
-            or any(keyword in text.lower() for keyword in SUSPICIOUS_KEYWORDS)
-        ]
-        intelligence["emailAddresses"].extend(suspicious_emails)
-        
-        # Extract Bitcoin addresses if present
-        bitcoin_matches = re.findall(BITCOIN_REGEX, text)
-        intelligence["bitcoinAddresses"].extend(bitcoin_matches)
-        
-        # Extract IP addresses
-        ip_matches = re.findall(IP_ADDRESS_REGEX, text)
-        intelligence["ipAddresses"].extend(ip_matches)
-        
-        # Extract suspicious keywords
+        # Single pass over the text for every pattern
+        for m in COMBINED_RE.finditer(text):
+            group = m.lastgroup
+            value = m.group()
+            if group == "phone":
+                value = _normalize_phone(value)
+            elif group == "bank" and is_likely_timestamp(value):
+                continue  # 10/13-digit epoch timestamps aren't accounts
+            intelligence[GROUP_TO_BUCKET[group]].append(value)
+
         text_lower = text.lower()
-        found_keywords = [
-            kw for kw in SUSPICIOUS_KEYWORDS 
-            if kw in text_lower
-        ]
-        intelligence["suspiciousKeywords"].extend(found_keywords)
-        
-        # Extract from full conversation for better context
-        if full_conversation:
-            for msg in full_conversation:
-                msg_text = msg.get("text", "")
-                intelligence["upiIds"].extend(re.findall(UPI_REGEX, msg_text, re.IGNORECASE))
-                intelligence["phishingLinks"].extend(re.findall(URL_REGEX, msg_text))
-                intelligence["phoneNumbers"].extend(re.findall(PHONE_REGEX, msg_text))
-                intelligence["emailAddresses"].extend(re.findall(EMAIL_REGEX, msg_text))
-        
+
+        # Filter out common non-suspicious emails
+        if intelligence["emailAddresses"]:
+            intelligence["emailAddresses"] = [
+                e for e in intelligence["emailAddresses"]
+                if not any(domain in e.lower() for domain in ["@gmail.com", "@yahoo.com", "@outlook.com"])
+                or SUSPICIOUS_KEYWORD_MATCHER.any_in(text_lower)
+            ]
+
+        # Extract suspicious keywords in one pass
+        intelligence["suspiciousKeywords"].extend(SUSPICIOUS_KEYWORD_MATCHER.find(text_lower))
+
         # Clean and deduplicate
         intelligence = clean_intelligence(intelligence)
-        
-        logger.debug(f"Extracted intelligence: {intelligence}")
-        
+
+        logger.debug("Extracted intelligence: %s", intelligence)
+
     except Exception as e:
         logger.error(f"Error during intelligence extraction: {e}")
-    
-    return intelligence
+
+    return tuple(frozenset(intelligence[bucket]) for bucket in _BUCKETS)
 
 
 def is_likely_timestamp(number_str: str) -> bool:
-    """Check if a number string is likely a timestamp rather than account."""
-    if len(number_str) > 13:
-        return False  # Timestamps rarely exceed 13 digits
-    
-    # Timestamps usually very large (1000000000+)
-    try:
-        num = int(number_str)
-        return num > 1000000000  # Unix timestamp threshold
-    except:
-        return False
+    """Check if a number string is likely a timestamp rather than account.
+
+    The regex upstream guarantees pure digits, so instead of building an
+    arbitrary-precision int just to compare it, use the shape of current-era
+    Unix timestamps: 10 digits (seconds) or 13 digits (milliseconds), with a
+    leading 1 or 2 (valid from 2001 through 2065).
+    """
+    n = len(number_str)
+    return (n == 10 or n == 13) and number_str[0] in "12"
 
 
-def enrich_intelligence(intelligence: Dict, context: str = "") -> Dict:
+def enrich_intelligence(intelligence: Dict[str, set], context: str = "") -> Dict:
     """
     Enrich extracted intelligence with additional analysis.
     
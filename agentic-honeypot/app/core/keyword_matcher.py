@@ -0,0 +1,64 @@
+"""Single-pass multi-keyword matching for scam keyword lists."""
+
+import re
+from typing import Iterable, Set
+
+try:
+    import ahocorasick  # pyahocorasick: C-level Aho-Corasick automaton
+except ImportError:
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """
+    Matches a fixed set of literal keywords against text in one pass.
+
+    Uses a pyahocorasick automaton when the package is installed, falling
+    back to a precompiled regex alternation otherwise. Either way the text
+    is traversed once instead of once per keyword, and matching keeps the
+    substring semantics of the original ``kw in text`` checks (so "block"
+    still hits inside "blocked").
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self._keywords = tuple(keywords)
+
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for kw in self._keywords:
+                self._automaton.add_word(kw, kw)
+            self._automaton.make_automaton()
+            self._regex = None
+        else:
+            self._automaton = None
+            # Zero-width lookahead so matches may overlap: the scan resumes
+            # right after each match position instead of after the matched
+            # text, so a keyword straddling the end of another ("today"
+            # inside "secretoday") is still found. Longest-first within the
+            # alternation; keywords shadowed at the same start position
+            # (prefixes of the winner) are recovered via the subsumption map.
+            ordered = sorted(self._keywords, key=len, reverse=True)
+            self._regex = re.compile(
+                "(?=(" + "|".join(map(re.escape, ordered)) + "))"
+            )
+            self._subsumed = {
+                kw: tuple(other for other in self._keywords if other in kw)
+                for kw in self._keywords
+            }
+
+    def find(self, text_lower: str) -> Set[str]:
+        """Return the set of keywords present in (lowercased) text."""
+        if self._automaton is not None:
+            return {kw for _, kw in self._automaton.iter(text_lower)}
+        found = set()
+        for match in self._regex.finditer(text_lower):
+            found.update(self._subsumed[match.group(1)])
+        return found
+
+    def any_in(self, text_lower: str) -> bool:
+        """Check whether any keyword is present in (lowercased) text."""
+        if self._automaton is not None:
+            for _ in self._automaton.iter(text_lower):
+                return True
+            return False
+        return self._regex.search(text_lower) is not None
@@ -1,6 +1,16 @@
 import re
+from collections import Counter
+from enum import IntFlag, auto
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
 from app.utils.logger import get_logger
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 logger = get_logger(__name__)
 
 # Scam Detection Patterns
@@ -16,100 +26,353 @@ BANK_ACCOUNT_REGEX = r"\b\d{9,18}\b"  # Bank accounts typically 9-18 digits
 SUSPICIOUS_DOMAIN_REGEX = r"(@[a-zA-Z0-9-]+\.[a-zA-Z]{2,})"  # Suspicious domains
 
 
-def detect_scam(message: str, conversation_history: list = None) -> tuple:
+def _keyword_pattern(keywords: List[str]) -> "re.Pattern":
+    """Compile a keyword list into one alternation pattern.
+
+    Deliberately no word boundaries: the original checks were substring
+    probes ("block" must still hit "blocked"). Longest-first ordering so
+    overlapping keywords resolve to the longer literal.
+    """
+    return re.compile(
+        "|".join(map(re.escape, sorted(keywords, key=len, reverse=True)))
+    )
+
+
+# Every scored keyword category in one place. Note some keywords belong
+# to more than one category ("click", "update"), so the merged scan maps
+# each literal to a tuple of categories.
+CATEGORY_KEYWORDS = {
+    "financial": FINANCIAL_KEYWORDS,
+    "action": ACTION_KEYWORDS,
+    "sensitive": SENSITIVE_KEYWORDS,
+    "urgency": URGENCY_KEYWORDS,
+    "threat": THREAT_KEYWORDS,
+    "action_request": ACTION_REQUEST_KEYWORDS,
+}
+
+# Preferred path: one Aho-Corasick automaton over the merged keyword set,
+# so detect_scam walks the message once for all categories. The automaton
+# reports overlapped literals ("blocked" hits both "block" and "locked"),
+# matching the original per-keyword substring probes; each word carries
+# its keyword so hits can be deduplicated to distinct keywords.
+if ahocorasick is not None:
+    _AUTOMATON = ahocorasick.Automaton()
+    _keyword_categories: Dict[str, List[str]] = {}
+    for _cat, _keywords in CATEGORY_KEYWORDS.items():
+        for _kw in _keywords:
+            _keyword_categories.setdefault(_kw, []).append(_cat)
+    for _kw, _cats in _keyword_categories.items():
+        _AUTOMATON.add_word(_kw, (_kw, tuple(_cats)))
+    _AUTOMATON.make_automaton()
+else:
+    _AUTOMATON = None
+
+# Fallback: one precompiled scan per category. The zero-width lookahead
+# makes matches overlapping ("blocked" yields both "block" and "locked"),
+# so a single pass finds every keyword present as a substring, exactly
+# like the original per-keyword probes.
+def _overlapping_keyword_pattern(keywords: List[str]) -> "re.Pattern":
+    """Compile keywords into an overlapping-match (lookahead) alternation."""
+    return re.compile(
+        "(?=(" + "|".join(map(re.escape, sorted(keywords, key=len, reverse=True))) + "))"
+    )
+
+
+def _subsumption_map(keywords: List[str]) -> Dict[str, tuple]:
+    """Map each keyword to same-category keywords it contains.
+
+    At a given position the longest alternative wins, so a keyword that is
+    a prefix of another would be missed there; expanding matched literals
+    through this map restores it.
+    """
+    subsumed = {
+        kw: tuple(other for other in keywords if other != kw and other in kw)
+        for kw in keywords
+    }
+    return {kw: contained for kw, contained in subsumed.items() if contained}
+
+
+# (category, bound findall, subsumption map) resolved once at import, so
+# the fallback scan loop skips the per-call attribute lookups
+_CATEGORY_SCANNERS = tuple(
+    (cat, _overlapping_keyword_pattern(keywords).findall, _subsumption_map(keywords))
+    for cat, keywords in CATEGORY_KEYWORDS.items()
+)
+
+
+def _category_counts(msg: str) -> Counter:
+    """Count distinct keywords present per category, scanning once.
+
+    Distinct keywords, not occurrences: the original scoring counted each
+    keyword at most once per message (sum of `w in msg` probes), so
+    repeating a word must not inflate the score. Both backends produce
+    the same keyword sets by construction, so scores don't depend on
+    whether the optional ahocorasick import succeeded.
+    """
+    counts: Counter = Counter()
+    if _AUTOMATON is not None:
+        seen = set()
+        for _, (kw, cats) in _AUTOMATON.iter(msg):
+            if kw not in seen:
+                seen.add(kw)
+                for cat in cats:
+                    counts[cat] += 1
+    else:
+        for cat, findall, subsumed in _CATEGORY_SCANNERS:
+            found = set(findall(msg))
+            if found:
+                for kw in tuple(found):
+                    found.update(subsumed.get(kw, ()))
+                counts[cat] = len(found)
+    return counts
+
+# Compiled once at import instead of re.search re-fetching the patterns
+# from the regex cache on every call. The two checks stay independent:
+# fusing them into one alternation lets whichever branch matches first
+# consume characters the other needed (an @-domain ending right before
+# "http" eats the scheme's first letters and hides the URL).
+URL_RE = re.compile(URL_REGEX)
+SUSPICIOUS_DOMAIN_RE = re.compile(SUSPICIOUS_DOMAIN_REGEX)
+
+class Reason(IntFlag):
+    """Why a message scored - tracked as bits, rendered to text on demand."""
+    FINANCIAL = auto()
+    ACTION = auto()
+    SENSITIVE = auto()
+    URGENCY = auto()
+    THREAT = auto()
+    URL = auto()
+    DOMAIN = auto()
+    ACTION_REQUEST = auto()
+    CLASSIC = auto()
+    ESCALATION = auto()
+
+
+# Human-readable reason strings, in the order callers have always seen them
+REASON_NAMES = (
+    (Reason.FINANCIAL, "financial context"),
+    (Reason.ACTION, "action requested"),
+    (Reason.SENSITIVE, "sensitive info request"),
+    (Reason.URGENCY, "urgency/threat tactics"),
+    (Reason.THREAT, "threat language"),
+    (Reason.URL, "external link detected"),
+    (Reason.DOMAIN, "suspicious domain"),
+    (Reason.ACTION_REQUEST, "malicious action request"),
+    (Reason.CLASSIC, "classic scam pattern detected"),
+    (Reason.ESCALATION, "escalation despite user hesitation"),
+)
+
+
+def _materialize_reasons(flags: "Reason") -> List[str]:
+    """Render a reason bitmask to the human-readable list."""
+    return [name for bit, name in REASON_NAMES if flags & bit]
+
+
+# Words a hesitant user replies with - scanned once per ingested user
+# message, not per detection call
+HESITATION_RE = _keyword_pattern(["worried", "doubt", "safe", "hesitate", "not sure"])
+
+
+def user_hesitation(text_lower: str) -> bool:
+    """Whether an already-lowercased user message expresses hesitation."""
+    return HESITATION_RE.search(text_lower) is not None
+
+
+# Union of every signal detect_scam can score on: any keyword from any
+# category, a URL, or an @-domain. If none of these appear the score is
+# guaranteed to be zero, so callers can skip session work entirely.
+_ALL_SIGNAL_KEYWORDS = sorted(
+    set(
+        FINANCIAL_KEYWORDS + ACTION_KEYWORDS + SENSITIVE_KEYWORDS
+        + URGENCY_KEYWORDS + THREAT_KEYWORDS + ACTION_REQUEST_KEYWORDS
+    ),
+    key=len, reverse=True
+)
+PREFILTER_RE = re.compile(
+    "|".join(map(re.escape, _ALL_SIGNAL_KEYWORDS)) + r"|https?://|@"
+)
+
+
+def quick_scam_prefilter(message: str) -> bool:
+    """
+    Cheap one-pass check for whether a message could score at all.
+
+    Returns False only when detect_scam is guaranteed to return
+    (False, [], 0), so benign probes can be ignored before any session
+    state is created or touched.
+    """
+    return PREFILTER_RE.search(message.lower()) is not None
+
+
+def detect_scam(
+    message: str,
+    conversation_history: Optional[List] = None,
+    return_details: bool = False,
+    msg_lower: Optional[str] = None,
+    user_hesitated: Optional[bool] = None
+):
     """
     Detect if a message contains scam intent using pattern matching and context.
-    
+
+    Args:
+        msg_lower: Precomputed lowercase form of message, if the caller
+            already has one cached (Message namedtuples carry it) - skips
+            re-folding and re-allocating the string here.
+        user_hesitated: Whether the user has expressed hesitation earlier
+            in the session. Sessions track this as a monotone flag when
+            messages are ingested; passing it makes the escalation check
+            O(1) instead of rescanning history here. When None, falls back
+            to scanning the last few history messages.
+
     Returns:
-        tuple: (is_scam: bool, reasons: list, score: int)
+        tuple: (is_scam: bool, reasons: list, score: int), with the scam-type
+        classification dict appended as a fourth element when return_details
+        is True - saving the caller a second pass over the message.
+    """
+    msg = msg_lower if msg_lower is not None else message.lower()
+    flags, score = _detect_scam_pure(msg)
+
+    # Legacy path for callers without session state: derive the flag from
+    # recent history
+    if user_hesitated is None and conversation_history:
+        try:
+            user_hesitated = any(
+                msg_obj.sender == "user" and user_hesitation(msg_obj.text_lower)
+                for msg_obj in conversation_history[-3:]
+            )
+        except Exception as e:
+            logger.debug("Error during context-aware detection: %s", e)
+
+    # Scammer escalating with urgency/threat language despite user
+    # hesitation. The reason bits already encode whether either category
+    # hit, so no rescan of the message is needed.
+    if user_hesitated and flags & (Reason.URGENCY | Reason.THREAT):
+        score += 2
+        flags |= Reason.ESCALATION
+
+    # Bits become human-readable strings only here, at the boundary
+    reasons = _materialize_reasons(flags)
+
+    logger.debug("Message score: %s, Reasons: %s", score, reasons)
+
+    if return_details:
+        return score >= 4, reasons, score, _scam_types(msg)
+
+    return score >= 4, reasons, score
+
+
+@lru_cache(maxsize=4096)
+def _detect_scam_pure(msg: str) -> Tuple["Reason", int]:
+    """Score a lowercased message on its own, ignoring conversation context.
+
+    Memoized: honeypot traffic repeats the same scam templates across
+    sessions, and a cache hit skips the whole keyword/regex pipeline.
+    Returns a (reason bitmask, score) pair; reasons materialize to text
+    only at the detect_scam boundary, and the history-dependent
+    escalation bonus is layered on there too.
     """
-    msg = message.lower()
     score = 0
-    reasons = []
-    
+    flags = Reason(0)
+
+    # All keyword categories counted in a single merged scan
+    counts = _category_counts(msg)
+
     # Financial context
-    financial_matches = sum(1 for w in FINANCIAL_KEYWORDS if w in msg)
+    financial_matches = counts["financial"]
     if financial_matches > 0:
         score += financial_matches
-        reasons.append("financial context")
-    
+        flags |= Reason.FINANCIAL
+
     # Action requested
-    action_matches = sum(1 for w in ACTION_KEYWORDS if w in msg)
+    action_matches = counts["action"]
     if action_matches > 0:
         score += action_matches
-        reasons.append("action requested")
-    
+        flags |= Reason.ACTION
+
     # Sensitive information request (HIGH WEIGHT)
-    sensitive_matches = sum(1 for w in SENSITIVE_KEYWORDS if w in msg)
+    sensitive_matches = counts["sensitive"]
     if sensitive_matches > 0:
         score += sensitive_matches * 3
-        reasons.append("sensitive info request")
-    
+        flags |= Reason.SENSITIVE
+
     # Urgency/Threat tactics (HIGH WEIGHT)
-    urgency_matches = sum(1 for w in URGENCY_KEYWORDS if w in msg)
-    threat_matches = sum(1 for w in THREAT_KEYWORDS if w in msg)
+    urgency_matches = counts["urgency"]
+    threat_matches = counts["threat"]
     if urgency_matches > 0:
         score += urgency_matches * 2
-        reasons.append("urgency/threat tactics")
+        flags |= Reason.URGENCY
     if threat_matches > 0:
         score += threat_matches * 2
-        if "urgency/threat tactics" not in reasons:
-            reasons.append("threat language")
-    
+        # "threat language" is only reported when urgency didn't already
+        # cover it, as before
+        if not urgency_matches:
+            flags |= Reason.THREAT
+
     # External links (HIGH WEIGHT)
-    if re.search(URL_REGEX, msg):
+    if URL_RE.search(msg):
         score += 3
-        reasons.append("external link detected")
-    
+        flags |= Reason.URL
+
     # Suspicious domains
-    if re.search(SUSPICIOUS_DOMAIN_REGEX, msg):
+    if SUSPICIOUS_DOMAIN_RE.search(msg):
         score += 2
-        reasons.append("suspicious domain")
-    
+        flags |= Reason.DOMAIN
+
     # Action request for links/downloads (HIGH WEIGHT)
-    action_request_matches = sum(1 for w in ACTION_REQUEST_KEYWORDS if w in msg)
+    action_request_matches = counts["action_request"]
     if action_request_matches > 0:
         score += action_request_matches * 2
-        reasons.append("malicious action request")
-    
-    # Check for combination of financial + action + urgency (typical scam pattern)
-    has_financial = any(w in msg for w in FINANCIAL_KEYWORDS)
-    has_action = any(w in msg for w in ACTION_KEYWORDS)
-    has_urgency = any(w in msg for w in URGENCY_KEYWORDS)
-    
-    if has_financial and has_action and has_urgency:
+        flags |= Reason.ACTION_REQUEST
+
+    # Check for combination of financial + action + urgency (typical scam
+    # pattern) - the counts above already answer this, no extra scans
+    if financial_matches and action_matches and urgency_matches:
         score += 5
-        reasons.append("classic scam pattern detected")
-    
-    # Context-aware detection: Check if previous message was user resistance
-    if conversation_history:
-        try:
-            # If scammer is escalating despite user hesitation
-            for msg_obj in conversation_history[-3:]:  # Check last 3 messages
-                if msg_obj.get("sender") == "user" and any(w in msg_obj.get("text", "").lower() for w in ["worried", "doubt", "safe", "hesitate", "not sure"]):
-                    if any(w in msg for w in URGENCY_KEYWORDS + THREAT_KEYWORDS):
-                        score += 2
-                        reasons.append("escalation despite user hesitation")
-        except Exception as e:
-            logger.debug(f"Error during context-aware detection: {e}")
-    
-    logger.debug(f"Message score: {score}, Reasons: {reasons}")
-    
-    return score >= 4, reasons, score
+        flags |= Reason.CLASSIC
 
+    return flags, score
+
+
+def detect_scam_batch(messages: List[str]) -> List[Tuple[bool, List[str], int]]:
+    """Classify many messages in one call, for offline transcript replay.
+
+    Hoists the per-message dispatch out of caller loops and leans on the
+    memoized core, so replaying logs full of repeated scam templates is
+    mostly cache hits. Context-dependent bonuses (which need per-session
+    history) are intentionally not applied here.
+
+    Returns:
+        One (is_scam, reasons, score) tuple per input message, in order.
+    """
+    pure = _detect_scam_pure
+    results = []
+    append = results.append
+    for message in messages:
+        flags, score = pure(message.lower())
+        append((score >= 4, _materialize_reasons(flags), score))
+    return results
+
+
+# Scam-type classification vocabularies. These overlap but don't equal
+# the scored categories ("link" is classification-only), so each gets its
+# own precompiled single-pass pattern instead of per-keyword probes.
+_SCAM_TYPE_PATTERNS = (
+    ("credential theft", _keyword_pattern(["otp", "password", "pin", "cvv"])),
+    ("malware distribution", _keyword_pattern(["click", "download", "link"])),
+    ("financial fraud", _keyword_pattern(["bank", "account", "upi", "payment"])),
+    ("phishing", _keyword_pattern(["verify", "confirm", "update"])),
+)
+
+
+def _scam_types(msg: str) -> Dict[str, List[str]]:
+    """Classify scam types for an already-lowercased message."""
+    scam_type = [
+        label for label, pattern in _SCAM_TYPE_PATTERNS if pattern.search(msg)
+    ]
 
-def get_scam_details(message: str) -> dict:
-    """Get detailed scam classification."""
-    msg = message.lower()
-    
-    scam_type = []
-    if any(w in msg for w in ["otp", "password", "pin", "cvv"]):
-        scam_type.append("credential theft")
-    if any(w in msg for w in ["click", "download", "link"]):
-        scam_type.append("malware distribution")
-    if any(w in msg for w in ["bank", "account", "upi", "payment"]):
-        scam_type.append("financial fraud")
-    if any(w in msg for w in ["verify", "confirm", "update"]):
-        scam_type.append("phishing")
-    
     return {"types": scam_type if scam_type else ["unknown scam"]}
+
+
+def get_scam_details(message: str) -> Dict[str, List[str]]:
+    """Get detailed scam classification."""
+    return _scam_types(message.lower())
@@ -1,30 +1,64 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import router
+from app.services.guvi_callback import (
+    open_async_client,
+    close_async_client,
+    start_callback_worker,
+    stop_callback_worker
+)
 from app.utils.config import settings
 from app.utils.logger import get_logger
 from app.core.exceptions import HoneypotException
 
 logger = get_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared resources for the app's lifetime and close them on exit."""
+    open_async_client()
+    start_callback_worker()
+    logger.info(f"🚀 {settings.API_TITLE} v{settings.API_VERSION} starting...")
+    logger.info(f"API Key configured: {'*' * 10}...")
+    logger.info(f"GUVI Callback endpoint: {settings.GUVI_ENDPOINT}")
+    yield
+    await stop_callback_worker()
+    await close_async_client()
+    logger.info("🛑 Shutting down API...")
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.API_TITLE,
     description="Agentic Honeypot for Scam Detection & Intelligence Extraction",
     version=settings.API_VERSION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    # orjson encodes responses several times faster than stdlib json
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# Add CORS middleware for cross-origin requests
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# CORS middleware only when a browser client actually needs it - traffic
+# here is normally server-to-server, and every middleware layer costs a
+# call frame per request. Credentials require concrete origins.
+if settings.ENABLE_CORS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            origin.strip()
+            for origin in settings.CORS_ORIGINS.split(",")
+            if origin.strip()
+        ],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
 # Include routers
 app.include_router(router)
@@ -34,8 +68,8 @@ app.include_router(router)
 @app.exception_handler(HoneypotException)
 async def honeypot_exception_handler(request: Request, exc: HoneypotException):
     """Handle custom honeypot exceptions."""
-    logger.error(f"Honeypot exception: {exc}")
-    return JSONResponse(
+    logger.error("Honeypot exception: %s", exc, exc_info=settings.LOG_TRACEBACKS)
+    return ORJSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
         content={"status": "error", "message": str(exc)}
     )
@@ -44,21 +78,23 @@ async def honeypot_exception_handler(request: Request, exc: HoneypotException):
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle unexpected exceptions."""
-    logger.error(f"Unexpected exception: {exc}", exc_info=True)
-    return JSONResponse(
+    logger.error("Unexpected exception: %s", exc, exc_info=settings.LOG_TRACEBACKS)
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"status": "error", "message": "Internal server error"}
     )
 
 
-# Middleware for logging
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all incoming requests."""
-    logger.debug(f"{request.method} {request.url.path}")
-    response = await call_next(request)
-    logger.debug(f"Response status: {response.status_code}")
-    return response
+# Request-logging middleware, registered only when debug logging is on so
+# production requests don't pay for the extra ASGI layer
+if logger.isEnabledFor(logging.DEBUG):
+    @app.middleware("http")
+    async def log_requests(request: Request, call_next):
+        """Log all incoming requests."""
+        logger.debug("%s %s", request.method, request.url.path)
+        response = await call_next(request)
+        logger.debug("Response status: %s", response.status_code)
+        return response
 
 
 # Root endpoint
@@ -79,19 +115,3 @@ def root():
         },
         "authentication": "Requires x-api-key header"
     }
-
-
-# Startup event
-@app.on_event("startup")
-async def startup_event():
-    """Log startup information."""
-    logger.info(f"🚀 {settings.API_TITLE} v{settings.API_VERSION} starting...")
-    logger.info(f"API Key configured: {'*' * 10}...")
-    logger.info(f"GUVI Callback endpoint: {settings.GUVI_ENDPOINT}")
-
-
-# Shutdown event
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Log shutdown information."""
-    logger.info("🛑 Shutting down API...")
@@ -30,7 +30,7 @@ class AnalyzeMessageRequestModel(BaseModel):
     """Request payload for message analysis."""
     sessionId: str = Field(..., description="Unique session identifier")
     message: MessageModel = Field(..., description="Current message to analyze")
-    conversationHistory: List[Dict[str, Any]] = Field(
+    conversationHistory: List[MessageModel] = Field(
         default_factory=list,
         description="Previous messages in conversation"
     )
@@ -1,4 +1,9 @@
+import asyncio
+import logging
+
+import orjson
 import requests
+import httpx
 import json
 from typing import Dict, List, Optional
 from app.utils.config import settings
@@ -7,6 +12,218 @@ from app.core.exceptions import CallbackException
 
 logger = get_logger(__name__)
 
+# Bound once at import - every finalized session posts to the same place
+# with the same headers, so there's no reason to rebuild them per call.
+# Pre-parsing the URL also spares httpx re-validating it on each POST.
+_GUVI_URL = httpx.URL(settings.GUVI_ENDPOINT)
+_HEADERS = {"Content-Type": "application/json"}
+_TIMEOUT = settings.GUVI_CALLBACK_TIMEOUT
+_DEFAULT_NOTES = "Scammer attempted fraud through social engineering."
+
+# Shared async client so background callbacks reuse keep-alive connections
+# instead of paying TCP+TLS setup per finalized session. Opened at app
+# startup and closed at shutdown; created lazily as a fallback for callers
+# outside the FastAPI lifecycle (scripts, tests).
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(
+            timeout=_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=32)
+        )
+    return _async_client
+
+
+def open_async_client() -> None:
+    """Create the shared callback client (called at app startup)."""
+    _get_async_client()
+
+
+async def close_async_client() -> None:
+    """Close the shared callback client (called at app shutdown)."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+# Bounded queue drained by a single worker, so a burst of finalized
+# sessions can't spawn unbounded concurrent POSTs against GUVI
+CALLBACK_QUEUE_MAXSIZE = 256
+CALLBACK_MAX_ATTEMPTS = 3
+CALLBACK_RETRY_BASE_DELAY = 1.0  # seconds, doubled per retry
+
+_callback_queue: Optional["asyncio.Queue"] = None
+_callback_worker_task: Optional["asyncio.Task"] = None
+
+# Strong references to fallback fire-and-forget tasks so the event loop
+# doesn't garbage-collect them mid-flight
+_fallback_tasks: set = set()
+
+
+async def _callback_worker() -> None:
+    """Drain queued final results, retrying failures with backoff."""
+    while True:
+        job = await _callback_queue.get()
+        try:
+            delay = CALLBACK_RETRY_BASE_DELAY
+            for attempt in range(1, CALLBACK_MAX_ATTEMPTS + 1):
+                if await send_final_result_async(**job):
+                    break
+                if attempt < CALLBACK_MAX_ATTEMPTS:
+                    logger.warning(
+                        "Callback for session %s failed (attempt %s/%s), retrying in %.0fs",
+                        job["session_id"], attempt, CALLBACK_MAX_ATTEMPTS, delay
+                    )
+                    await asyncio.sleep(delay)
+                    delay *= 2
+                else:
+                    logger.error(
+                        "Callback for session %s dropped after %s attempts",
+                        job["session_id"], CALLBACK_MAX_ATTEMPTS
+                    )
+        finally:
+            _callback_queue.task_done()
+
+
+def start_callback_worker() -> None:
+    """Create the callback queue and worker (called at app startup)."""
+    global _callback_queue, _callback_worker_task
+    if _callback_worker_task is None:
+        _callback_queue = asyncio.Queue(maxsize=CALLBACK_QUEUE_MAXSIZE)
+        _callback_worker_task = asyncio.create_task(_callback_worker())
+
+
+async def stop_callback_worker() -> None:
+    """Cancel the callback worker (called at app shutdown)."""
+    global _callback_queue, _callback_worker_task
+    if _callback_worker_task is not None:
+        _callback_worker_task.cancel()
+        try:
+            await _callback_worker_task
+        except asyncio.CancelledError:
+            pass
+        _callback_worker_task = None
+        _callback_queue = None
+
+
+def enqueue_final_result(
+    session_id: str,
+    intelligence: Dict,
+    total_messages: int,
+    agent_notes: str = "",
+    scam_detected: bool = True
+) -> None:
+    """Queue a final result for background delivery with retries.
+
+    Falls back to a direct fire-and-forget task when the worker isn't
+    running (callers outside the FastAPI lifecycle), or to a blocking
+    synchronous send when there's no running event loop at all (scripts,
+    tests). A full queue drops the result with an error rather than
+    blocking the request path.
+    """
+    job = {
+        "session_id": session_id,
+        "intelligence": intelligence,
+        "total_messages": total_messages,
+        "agent_notes": agent_notes,
+        "scam_detected": scam_detected
+    }
+    if _callback_queue is None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to schedule on - deliver synchronously so the
+            # result isn't silently lost (and create_task doesn't raise)
+            try:
+                send_final_result(**job)
+            except CallbackException as e:
+                logger.error(
+                    "Fallback delivery failed for session %s: %s", session_id, e
+                )
+            return
+        task = loop.create_task(send_final_result_async(**job))
+        _fallback_tasks.add(task)
+        task.add_done_callback(_fallback_tasks.discard)
+        return
+    try:
+        _callback_queue.put_nowait(job)
+    except asyncio.QueueFull:
+        logger.error(
+            "Callback queue full; dropping final result for session %s", session_id
+        )
+
+
+def _build_payload(
+    session_id: str,
+    intelligence: Dict,
+    total_messages: int,
+    agent_notes: str,
+    scam_detected: bool
+) -> Dict:
+    """Build the final-result payload for the GUVI endpoint."""
+    return {
+        "sessionId": session_id,
+        "scamDetected": scam_detected,
+        "totalMessagesExchanged": total_messages,
+        "extractedIntelligence": {
+            "bankAccounts": intelligence.get("bankAccounts", []),
+            "upiIds": intelligence.get("upiIds", []),
+            "phishingLinks": intelligence.get("phishingLinks", []),
+            "phoneNumbers": intelligence.get("phoneNumbers", []),
+            "suspiciousKeywords": intelligence.get("suspiciousKeywords", [])
+        },
+        "agentNotes": agent_notes or _DEFAULT_NOTES
+    }
+
+
+async def send_final_result_async(
+    session_id: str,
+    intelligence: Dict,
+    total_messages: int,
+    agent_notes: str = "",
+    scam_detected: bool = True
+) -> bool:
+    """
+    Send final extracted intelligence to GUVI without blocking the event loop.
+
+    Intended to run as a background task, so failures are logged rather
+    than raised - there is no caller left to handle them.
+
+    Returns:
+        bool: True if callback was successful, False otherwise
+    """
+    payload = _build_payload(session_id, intelligence, total_messages, agent_notes, scam_detected)
+
+    try:
+        logger.info(f"Sending final result for session {session_id}")
+
+        # Encode with orjson directly instead of httpx's stdlib-json path
+        response = await _get_async_client().post(
+            _GUVI_URL,
+            content=orjson.dumps(payload),
+            headers=_HEADERS
+        )
+
+        if response.status_code == 200:
+            logger.info(f"✓ Final result successfully sent for session {session_id}")
+            return True
+
+        logger.warning(
+            f"Final result callback returned status {response.status_code}: {response.text}"
+        )
+        return False
+
+    except httpx.TimeoutException:
+        logger.error(f"GUVI callback timeout for session {session_id}")
+        return False
+    except Exception as e:
+        logger.error(f"Unexpected error during GUVI callback: {e}")
+        return False
+
 
 def send_final_result(
     session_id: str,
@@ -28,29 +245,21 @@ def send_final_result(
     Returns:
         bool: True if callback was successful, False otherwise
     """
-    payload = {
-        "sessionId": session_id,
-        "scamDetected": scam_detected,
-        "totalMessagesExchanged": total_messages,
-        "extractedIntelligence": {
-            "bankAccounts": intelligence.get("bankAccounts", []),
-            "upiIds": intelligence.get("upiIds", []),
-            "phishingLinks": intelligence.get("phishingLinks", []),
-            "phoneNumbers": intelligence.get("phoneNumbers", []),
-            "suspiciousKeywords": intelligence.get("suspiciousKeywords", [])
-        },
-        "agentNotes": agent_notes or "Scammer attempted fraud through social engineering."
-    }
+    payload = _build_payload(session_id, intelligence, total_messages, agent_notes, scam_detected)
 
     try:
         logger.info(f"Sending final result for session {session_id}")
-        logger.debug(f"Payload: {json.dumps(payload, indent=2)}")
-        
+        # Pretty-printing allocates a full copy of the payload; only do it
+        # when debug logging is actually on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Payload: %s", json.dumps(payload, indent=2))
+
+
         response = requests.post(
             settings.GUVI_ENDPOINT,
-            json=payload,
-            timeout=settings.GUVI_CALLBACK_TIMEOUT,
-            headers={"Content-Type": "application/json"}
+            data=orjson.dumps(payload),
+            timeout=_TIMEOUT,
+            headers=_HEADERS
         )
         
         if response.status_code == 200:
@@ -64,7 +273,7 @@ def send_final_result(
             
     except requests.Timeout:
         logger.error(f"GUVI callback timeout for session {session_id}")
-        raise CallbackException(f"Callback timeout after {settings.GUVI_CALLBACK_TIMEOUT}s")
+        raise CallbackException(f"Callback timeout after {_TIMEOUT}s")
     except requests.ConnectionError as e:
         logger.error(f"Failed to connect to GUVI endpoint: {e}")
         raise CallbackException(f"Connection error: {str(e)}")
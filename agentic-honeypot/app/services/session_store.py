@@ -0,0 +1,266 @@
+"""Session storage backends for the honeypot.
+
+The default backend keeps sessions in-process (fine for a single worker);
+setting REDIS_URL switches to Redis so multiple Gunicorn/Uvicorn workers can
+share session state and expiry is handled natively by the server instead of
+scans on the request path.
+"""
+
+import time
+import zlib
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import orjson
+
+from app.utils.config import settings
+from app.utils.logger import get_logger
+
+try:
+    from redis import asyncio as redis_asyncio
+except ImportError:
+    redis_asyncio = None
+
+logger = get_logger(__name__)
+
+class Message(NamedTuple):
+    """A conversation message.
+
+    Lighter than the dicts the API receives: attribute access skips the
+    per-field hash lookup of .get(), and the lowercase form is folded once
+    at construction instead of at every keyword scan.
+    """
+    sender: str
+    text: str
+    timestamp: Any
+    text_lower: str
+
+
+def make_message(sender: str, text: str, timestamp: Any) -> Message:
+    """Build a Message, caching the lowercase text."""
+    return Message(sender, text, timestamp, text.lower())
+
+
+def message_key(msg: Message) -> tuple:
+    """Stable dedup key for a message.
+
+    crc32 rather than hash(): not salted per process, so keys survive a
+    Redis round trip between workers.
+    """
+    return (msg.sender, msg.timestamp, zlib.crc32(msg.text.encode()))
+
+
+INTELLIGENCE_BUCKETS = (
+    "bankAccounts", "upiIds", "phishingLinks", "phoneNumbers",
+    "suspiciousKeywords", "emailAddresses", "bitcoinAddresses", "ipAddresses"
+)
+
+
+def fresh_session_state() -> Dict[str, Any]:
+    """Build an empty session-state dict."""
+    return {
+        "messages": [],
+        "intelligence": {bucket: set() for bucket in INTELLIGENCE_BUCKETS},
+        "scammer_texts": [],
+        "agent_replies": [],
+        "recent_reply_ids": deque(maxlen=3),
+        "processed_ids": set(),  # message_key()s already run through extraction
+        "user_hesitated": False,  # monotone: set once a user message hesitates
+        "scam_detected": False,
+        "detection_details": {},
+        "created_at": None,  # ISO string, set once at creation
+        "last_activity": None,  # ISO string (Redis backend only)
+        "last_activity_mono": 0.0,  # monotonic float for TTL checks
+        "engagement_concluded": False,
+        "scam_score": 0
+    }
+
+
+class SessionStatePool:
+    """
+    Pool of pre-shaped session-state dicts.
+
+    Honeypot traffic creates many short-lived sessions; allocating eight
+    fresh sets plus the surrounding dicts/lists per session thrashes the
+    allocator. Expired session state is cleared and reused instead.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self._free: List[Dict[str, Any]] = []
+        self._max_size = max_size
+
+    def acquire(self) -> Dict[str, Any]:
+        """Return a cleared session-state dict, reusing a pooled one if available."""
+        if self._free:
+            return self._free.pop()
+        return fresh_session_state()
+
+    def release(self, state: Dict[str, Any]) -> None:
+        """Clear a session-state dict and return it to the pool."""
+        if len(self._free) >= self._max_size:
+            return
+        state["messages"].clear()
+        for bucket in state["intelligence"].values():
+            bucket.clear()
+        state["scammer_texts"].clear()
+        state["agent_replies"].clear()
+        state["recent_reply_ids"].clear()
+        state["processed_ids"].clear()
+        state["user_hesitated"] = False
+        state["scam_detected"] = False
+        state["detection_details"] = {}
+        state["created_at"] = None
+        state["last_activity"] = None
+        state["last_activity_mono"] = 0.0
+        state["engagement_concluded"] = False
+        state["scam_score"] = 0
+        self._free.append(state)
+
+
+class InMemorySessionStore:
+    """
+    Single-process session store.
+
+    Sessions are kept in an OrderedDict ordered least-recently-active
+    first, so cleanup pops expired entries from the front instead of
+    scanning every session per request.
+
+    Methods are async purely to share an interface with the Redis
+    backend - nothing here awaits, so calls resolve without suspending.
+    """
+
+    def __init__(self):
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._pool = SessionStatePool()
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return session state, or None if the session doesn't exist."""
+        return self._sessions.get(session_id)
+
+    async def get_or_create(
+        self, session_id: str, session: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Get existing session or create a new one, refreshing activity.
+
+        ``session`` is the result of a get() done earlier in the same
+        request, passed back so the backend doesn't fetch twice. TTL
+        bookkeeping uses time.monotonic() floats: no datetime object
+        allocation or timedelta math on the request path.
+        """
+        if session is None:
+            session = self._sessions.get(session_id)
+        if session is None:
+            session = self._pool.acquire()
+            session["created_at"] = datetime.now().isoformat()
+            session["last_activity_mono"] = time.monotonic()
+            self._sessions[session_id] = session
+            logger.info(f"Initialized new session: {session_id}")
+        else:
+            session["last_activity_mono"] = time.monotonic()
+            self._sessions.move_to_end(session_id)
+        return session
+
+    async def save(self, session_id: str, session: Dict[str, Any]) -> None:
+        """No-op: in-memory sessions are mutated in place."""
+
+    async def cleanup(self) -> None:
+        """Remove sessions that have timed out (O(expired) per call)."""
+        timeout_seconds = settings.SESSION_TIMEOUT_MINUTES * 60
+        now_mono = time.monotonic()
+
+        while self._sessions:
+            session_id, data = next(iter(self._sessions.items()))
+            if now_mono - data["last_activity_mono"] <= timeout_seconds:
+                break
+            logger.info(f"Cleaning up expired session: {session_id}")
+            self._sessions.popitem(last=False)
+            self._pool.release(data)
+
+    async def count(self) -> int:
+        """Number of live sessions."""
+        return len(self._sessions)
+
+
+class RedisSessionStore:
+    """
+    Redis-backed session store for multi-worker deployments.
+
+    Each session lives under its own key with a native TTL, so expiry is
+    handled by Redis and cleanup() costs nothing on the request path.
+    Session data is disposable, so no persistence configuration is needed.
+
+    Uses the redis.asyncio client: a synchronous client would block the
+    event loop for the full network round trip on every get/save, stalling
+    all in-flight requests on the worker.
+    """
+
+    KEY_PREFIX = "honeypot:session:"
+
+    def __init__(self, url: str):
+        if redis_asyncio is None:
+            raise RuntimeError("REDIS_URL is set but the redis package is not installed")
+        self._client = redis_asyncio.Redis.from_url(url)
+        self._ttl_seconds = settings.SESSION_TIMEOUT_MINUTES * 60
+
+    def _load(self, raw: bytes) -> Dict[str, Any]:
+        session = orjson.loads(raw)
+        # Intelligence buckets are serialized as lists; restore sets
+        session["intelligence"] = {
+            key: set(values) for key, values in session["intelligence"].items()
+        }
+        # Messages and the template-id ring buffer round-trip as lists
+        session["messages"] = [Message(*item) for item in session["messages"]]
+        session["recent_reply_ids"] = deque(
+            (tuple(item) for item in session.get("recent_reply_ids", ())), maxlen=3
+        )
+        session["processed_ids"] = {
+            tuple(item) for item in session.get("processed_ids", ())
+        }
+        return session
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return session state, or None if the session doesn't exist."""
+        raw = await self._client.get(self.KEY_PREFIX + session_id)
+        return self._load(raw) if raw else None
+
+    async def get_or_create(
+        self, session_id: str, session: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Get existing session or create a new one, refreshing activity.
+
+        ``session`` is the result of a get() done earlier in the same
+        request; passing it back skips a second deserializing GET.
+        """
+        if session is None:
+            session = fresh_session_state()
+            session["created_at"] = datetime.now().isoformat()
+            logger.info(f"Initialized new session: {session_id}")
+        session["last_activity"] = datetime.now().isoformat()
+        return session
+
+    async def save(self, session_id: str, session: Dict[str, Any]) -> None:
+        """Write session state back with a refreshed TTL."""
+        await self._client.setex(
+            self.KEY_PREFIX + session_id,
+            self._ttl_seconds,
+            orjson.dumps(session, default=list)
+        )
+
+    async def cleanup(self) -> None:
+        """No-op: Redis expires sessions natively via per-key TTL."""
+
+    async def count(self) -> int:
+        """Number of live sessions (scan is for the health endpoint only)."""
+        total = 0
+        async for _ in self._client.scan_iter(match=self.KEY_PREFIX + "*"):
+            total += 1
+        return total
+
+
+def create_session_store():
+    """Build the session store configured for this deployment."""
+    if settings.REDIS_URL:
+        logger.info("Using Redis session store")
+        return RedisSessionStore(settings.REDIS_URL)
+    return InMemorySessionStore()
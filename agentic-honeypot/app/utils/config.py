@@ -1,33 +1,78 @@
-import os
-from pydantic_settings import BaseSettings
-
-
-class Settings(BaseSettings):
-    """Application settings loaded from environment variables."""
-    
-    # API Configuration
-    API_TITLE: str = "Agentic Honeypot API"
-    API_VERSION: str = "1.0.0"
-    API_KEY: str = os.getenv("API_KEY", "your-secret-api-key-change-in-production")
-    
-    # GUVI Evaluation Endpoint
-    GUVI_ENDPOINT: str = "https://hackathon.guvi.in/api/updateHoneyPotFinalResult"
-    GUVI_CALLBACK_TIMEOUT: int = 10
-    
-    # Scam Detection Settings
-    SCAM_SCORE_THRESHOLD: int = 4  # Minimum score to trigger scam detection
-    MIN_MESSAGES_BEFORE_CALLBACK: int = 3  # Minimum messages before sending final result
-    MAX_MESSAGES_PER_SESSION: int = 20  # Max messages to prevent infinite loops
-    
-    # Session Settings
-    SESSION_TIMEOUT_MINUTES: int = 30
-    
-    # Logging
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
-    
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-
-
-settings = Settings()
+import os
+from dataclasses import dataclass, fields
+
+from pydantic_settings import BaseSettings
+
+
+class Settings(BaseSettings):
+    """Settings loader: parses environment variables and .env once at startup."""
+
+    # API Configuration
+    API_TITLE: str = "Agentic Honeypot API"
+    API_VERSION: str = "1.0.0"
+    API_KEY: str = os.getenv("API_KEY", "your-secret-api-key-change-in-production")
+
+    # GUVI Evaluation Endpoint
+    GUVI_ENDPOINT: str = "https://hackathon.guvi.in/api/updateHoneyPotFinalResult"
+    GUVI_CALLBACK_TIMEOUT: int = 10
+
+    # Scam Detection Settings
+    SCAM_SCORE_THRESHOLD: int = 4  # Minimum score to trigger scam detection
+    MIN_MESSAGES_BEFORE_CALLBACK: int = 3  # Minimum messages before sending final result
+    MAX_MESSAGES_PER_SESSION: int = 20  # Max messages to prevent infinite loops
+
+    # Session Settings
+    SESSION_TIMEOUT_MINUTES: int = 30
+    REDIS_URL: str = os.getenv("REDIS_URL", "")  # Empty = in-process session store
+
+    # CORS - off by default: scam platforms call this API server-to-server.
+    # When a browser dashboard needs it, enable and list concrete origins
+    # (comma-separated); credentials + wildcard is invalid per the CORS spec.
+    ENABLE_CORS: bool = False
+    CORS_ORIGINS: str = ""
+
+    # Logging
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # Formatting tracebacks on deep async stacks is expensive, and a
+    # scammer spamming bad payloads can turn it into a DoS vector -
+    # off by default, enable when actually debugging
+    LOG_TRACEBACKS: bool = False
+
+    class Config:
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+
+
+@dataclass(slots=True, frozen=True)
+class FrozenSettings:
+    """Immutable settings snapshot served to the rest of the app.
+
+    Attribute reads are C-level slot loads instead of pydantic descriptor
+    calls - settings are touched on every request (auth, callbacks,
+    session TTLs), so the hot paths get plain constants. Frozen also
+    guards against accidental runtime mutation.
+    """
+    API_TITLE: str
+    API_VERSION: str
+    API_KEY: str
+    GUVI_ENDPOINT: str
+    GUVI_CALLBACK_TIMEOUT: int
+    SCAM_SCORE_THRESHOLD: int
+    MIN_MESSAGES_BEFORE_CALLBACK: int
+    MAX_MESSAGES_PER_SESSION: int
+    SESSION_TIMEOUT_MINUTES: int
+    REDIS_URL: str
+    ENABLE_CORS: bool
+    CORS_ORIGINS: str
+    LOG_LEVEL: str
+    LOG_TRACEBACKS: bool
+
+
+def _load_settings() -> FrozenSettings:
+    loaded = Settings()
+    return FrozenSettings(
+        **{f.name: getattr(loaded, f.name) for f in fields(FrozenSettings)}
+    )
+
+
+settings = _load_settings()
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Make `from app...` imports work when pytest is run from anywhere
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,26 @@
+"""Regression tests for agent context analysis."""
+
+from app.core.agent import CONTEXT_CATEGORY_WORDS, analyze_message_context
+
+
+def test_overlapping_trigger_words_both_flagged():
+    # "http" and "password" overlap in "httpassword"; both categories must
+    # be set - password outranks link in reply-template priority, so losing
+    # it changes which reply the agent sends.
+    context = analyze_message_context("httpassword")
+    assert context["link"]
+    assert context["password"]
+
+
+def test_context_matches_per_word_substring_baseline():
+    for text in (
+        "click this link now",
+        "share your otp and cvv immediately",
+        "account blocked, verify today",
+        "nothing to see here",
+    ):
+        baseline = {
+            cat: any(word in text for word in words)
+            for cat, words in CONTEXT_CATEGORY_WORDS.items()
+        }
+        assert analyze_message_context(text) == baseline, text
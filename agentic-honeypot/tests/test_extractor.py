@@ -0,0 +1,35 @@
+"""Regression tests for the intelligence extraction pipeline."""
+
+from app.core.extractor import extract_intelligence
+
+
+def test_upi_handle_beats_phone_branch():
+    # A bare 10-digit number followed by @handle is a UPI ID, not a phone
+    # number - the phone alternative must not consume the leading
+    # whitespace and preempt the UPI branch in COMBINED_RE.
+    intel = extract_intelligence("pay 9876543210@ybl immediately")
+    assert intel["upiIds"] == {"9876543210@ybl"}
+    assert intel["phoneNumbers"] == set()
+
+
+def test_digit_local_part_email_beats_phone_branch():
+    intel = extract_intelligence("mail me at 9876543210@gmail.com urgent")
+    assert intel["emailAddresses"] == {"9876543210@gmail.com"}
+    assert intel["phoneNumbers"] == set()
+
+
+def test_phone_prefix_shapes_still_match():
+    for text in (
+        "Call +919876543210 immediately",
+        "Call 91 9876543210 now",
+        "Call 91-9876543210 now",
+        "Call 09876543210 now",
+        "number is 9876543210 ok",
+    ):
+        intel = extract_intelligence(text)
+        assert intel["phoneNumbers"] == {"9876543210"}, text
+
+
+def test_timestamp_shaped_digits_not_bank_accounts():
+    intel = extract_intelligence("sent at 1707110400000 from account 123456789012")
+    assert intel["bankAccounts"] == {"123456789012"}
@@ -0,0 +1,26 @@
+"""Regression tests for KeywordMatcher's regex fallback path."""
+
+from app.core.extractor import SUSPICIOUS_KEYWORDS
+from app.core.keyword_matcher import KeywordMatcher
+
+
+def test_boundary_crossing_keywords_both_found():
+    # "secret" and "today" overlap in "secretoday"; a non-overlapping scan
+    # consumes "secret" and resumes past the shared characters, losing
+    # "today". Both must be reported, matching the `kw in text` baseline.
+    matcher = KeywordMatcher(SUSPICIOUS_KEYWORDS)
+    assert matcher.find("secretoday") == {"secret", "today"}
+    assert matcher.any_in("secretoday")
+
+
+def test_find_matches_substring_probe_baseline():
+    matcher = KeywordMatcher(SUSPICIOUS_KEYWORDS)
+    for text in (
+        "urgent: verify now or account blocked",
+        "click to update your password today",
+        "nothing suspicious here",
+        "immediately immediate",
+    ):
+        baseline = {kw for kw in SUSPICIOUS_KEYWORDS if kw in text}
+        assert matcher.find(text) == baseline, text
+        assert matcher.any_in(text) == bool(baseline), text
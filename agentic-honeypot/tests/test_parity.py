@@ -0,0 +1,152 @@
+"""Parity tests: optimized scan paths vs the original per-keyword probes.
+
+The detection and extraction pipelines replaced per-keyword ``kw in text``
+probes and per-pattern findall calls with merged single-pass scans, on two
+interchangeable backends (pyahocorasick automaton / regex fallback). These
+tests pin the optimized paths to a straightforward reimplementation of the
+original semantics over a randomized corpus, on whichever backends can run.
+"""
+
+import random
+import re
+
+import app.core.scam_detector as scam_detector
+from app.core.extractor import SUSPICIOUS_KEYWORDS, extract_intelligence
+from app.core.scam_detector import (
+    CATEGORY_KEYWORDS,
+    SUSPICIOUS_DOMAIN_REGEX,
+    URL_REGEX,
+    _category_counts,
+    detect_scam,
+)
+
+# Messages the merged scans historically got wrong: repeated keywords,
+# overlapping literals, and patterns colliding in the raw text.
+TRICKY_MESSAGES = [
+    "urgent urgent",
+    "blocked",
+    "update update update",
+    "click click click here",
+    "secretoday",
+    "httpassword",
+    "contact me@scam-pay.comhttp://evil.com/x",
+    "pay 9876543210@ybl immediately",
+]
+
+
+def build_corpus(size: int = 500) -> list:
+    """Randomized messages biased toward keyword overlaps and collisions."""
+    rng = random.Random(1234)
+    vocab = sorted({kw for kws in CATEGORY_KEYWORDS.values() for kw in kws})
+    vocab += [
+        "hello", "friend", "pay", "me@scam-pay.com", "http://evil.com/x",
+        "secretoday", "urgentnow", "updatenow",
+    ]
+    corpus = list(TRICKY_MESSAGES)
+    for _ in range(size):
+        parts = [rng.choice(vocab) for _ in range(rng.randint(1, 8))]
+        # Sometimes concatenate without spaces so keywords straddle joins
+        corpus.append(rng.choice((" ", " ", "")).join(parts))
+    return corpus
+
+
+def baseline_counts(msg: str) -> dict:
+    """Distinct-keyword counts per category, as the original probes saw them."""
+    counts = {
+        cat: sum(1 for kw in keywords if kw in msg)
+        for cat, keywords in CATEGORY_KEYWORDS.items()
+    }
+    return {cat: n for cat, n in counts.items() if n}
+
+
+def baseline_detect(msg: str) -> tuple:
+    """The original detect_scam scoring, written out probe by probe."""
+    score = 0
+    reasons = []
+
+    counts = {
+        cat: sum(1 for kw in keywords if kw in msg)
+        for cat, keywords in CATEGORY_KEYWORDS.items()
+    }
+    if counts["financial"]:
+        score += counts["financial"]
+        reasons.append("financial context")
+    if counts["action"]:
+        score += counts["action"]
+        reasons.append("action requested")
+    if counts["sensitive"]:
+        score += counts["sensitive"] * 3
+        reasons.append("sensitive info request")
+    if counts["urgency"]:
+        score += counts["urgency"] * 2
+        reasons.append("urgency/threat tactics")
+    if counts["threat"]:
+        score += counts["threat"] * 2
+        if not counts["urgency"]:
+            reasons.append("threat language")
+    if re.search(URL_REGEX, msg):
+        score += 3
+        reasons.append("external link detected")
+    if re.search(SUSPICIOUS_DOMAIN_REGEX, msg):
+        score += 2
+        reasons.append("suspicious domain")
+    if counts["action_request"]:
+        score += counts["action_request"] * 2
+        reasons.append("malicious action request")
+    if counts["financial"] and counts["action"] and counts["urgency"]:
+        score += 5
+        reasons.append("classic scam pattern detected")
+
+    return score >= 4, reasons, score
+
+
+class BruteForceAutomaton:
+    """Stand-in for ahocorasick.Automaton when the package isn't installed.
+
+    iter() reports every occurrence of every word - including overlapped
+    ones - which is the contract _category_counts relies on.
+    """
+
+    def __init__(self, payloads):
+        self._payloads = payloads
+
+    def iter(self, text):
+        for kw, value in self._payloads:
+            start = text.find(kw)
+            while start != -1:
+                yield start + len(kw) - 1, value
+                start = text.find(kw, start + 1)
+
+
+def _brute_force_automaton() -> BruteForceAutomaton:
+    keyword_categories = {}
+    for cat, keywords in CATEGORY_KEYWORDS.items():
+        for kw in keywords:
+            keyword_categories.setdefault(kw, []).append(cat)
+    return BruteForceAutomaton(
+        [(kw, (kw, tuple(cats))) for kw, cats in keyword_categories.items()]
+    )
+
+
+def test_category_counts_regex_fallback_matches_baseline(monkeypatch):
+    monkeypatch.setattr(scam_detector, "_AUTOMATON", None)
+    for msg in build_corpus():
+        assert dict(_category_counts(msg)) == baseline_counts(msg), msg
+
+
+def test_category_counts_automaton_matches_baseline(monkeypatch):
+    monkeypatch.setattr(scam_detector, "_AUTOMATON", _brute_force_automaton())
+    for msg in build_corpus():
+        assert dict(_category_counts(msg)) == baseline_counts(msg), msg
+
+
+def test_detect_scam_matches_baseline():
+    scam_detector._detect_scam_pure.cache_clear()
+    for msg in build_corpus():
+        assert detect_scam(msg) == baseline_detect(msg), msg
+
+
+def test_extracted_keywords_match_substring_baseline():
+    for msg in build_corpus():
+        baseline = {kw for kw in SUSPICIOUS_KEYWORDS if kw in msg}
+        assert extract_intelligence(msg)["suspiciousKeywords"] == baseline, msg
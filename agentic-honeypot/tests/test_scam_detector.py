@@ -0,0 +1,26 @@
+"""Regression tests for scam detection scoring."""
+
+from app.core.scam_detector import detect_scam
+
+
+def test_adjacent_domain_and_url_both_score():
+    # An @-domain butted right up against a URL must yield both signals:
+    # a fused alternation lets the domain branch consume the scheme's
+    # first characters and hide the link entirely.
+    is_scam, reasons, score = detect_scam("contact me@scam-pay.comhttp://evil.com/x")
+    assert is_scam is True
+    assert score == 5
+    assert "external link detected" in reasons
+    assert "suspicious domain" in reasons
+
+
+def test_url_inside_message_scores_link():
+    _, reasons, score = detect_scam("go to http://evil.com/x")
+    assert score == 3
+    assert reasons == ["external link detected"]
+
+
+def test_domain_only_scores_domain():
+    _, reasons, score = detect_scam("mail me@scam-pay.com")
+    assert score == 2
+    assert reasons == ["suspicious domain"]